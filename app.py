@@ -1,72 +1,25 @@
 from __future__ import annotations
 
 import os
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-import uvicorn
-
-from app.config import load_app_config, init_env
-
-
-def create_app() -> FastAPI:
-    """FastAPIアプリケーションを作成"""
-    # .env 読み込み
-    init_env()
-    
-    # config.json 読み込み（後続の処理で使用）
-    cfg = load_app_config()
-    
-    # FastAPIアプリ作成
-    app = FastAPI(
-        title="見積プロトタイプ - PDF→Excel自動反映",
-        description="PDFファイルをOCR処理してExcelテンプレートに自動反映するアプリケーション",
-        version="2.0.0"
-    )
-    
-    # 静的ファイル配信
-    app.mount("/styles", StaticFiles(directory="app/ui/styles"), name="styles")
-    app.mount("/scripts", StaticFiles(directory="app/ui/scripts"), name="scripts")
-    
-    # APIルーター読み込み
-    from app.ui.pages.estimate_page import router
-    app.include_router(router, prefix="/api", tags=["estimate"])
-    
-    # トップページ
-    @app.get("/", tags=["frontend"])
-    async def root():
-        """メインページを返す"""
-        return FileResponse("app/ui/templates/index.html")
-    
-    # マニュアルファイル
-    @app.get("/見積もりアシスト_マニュアル.pdf", tags=["frontend"])
-    async def get_manual():
-        """マニュアルPDFファイルを返す"""
-        from pathlib import Path
-        from urllib.parse import quote
-        manual_path = Path(__file__).parent / "見積もりアシスト_マニュアル.pdf"
-        filename_encoded = quote("見積もりアシスト_マニュアル.pdf")
-        return FileResponse(
-            str(manual_path),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"inline; filename*=UTF-8''{filename_encoded}"}
-        )
-    
-    return app
-
-
-# FastAPIアプリインスタンス
-app = create_app()
 
+import uvicorn
 
 if __name__ == "__main__":
-    # python app.py で直接起動する場合
+    # python app.py で直接起動する場合の薄いランチャー。
+    # アプリ本体は app/main.py にある（このファイルを "app:app" で指すと
+    # インポート解決で app/ パッケージが勝ってしまい属性が見つからない）
     port = int(os.environ.get("PORT", 8000))  # Render対応: 環境変数PORTを使用
+    # ワーカー数は WEB_CONCURRENCY で上書き可能（Render の慣例に合わせる）。
+    # 既定は1固定: ジョブ登録（_excel_jobs / _applied_overrides）が
+    # ワーカープロセスのメモリに載っているため、複数ワーカーだと
+    # /process で発行した job_id が別ワーカーの /download で見つからない
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
     print("🚀 サーバーを起動中...")
     print(f"📱 ブラウザで http://localhost:{port} にアクセスしてください")
     uvicorn.run(
-        app,
+        "app.main:app",  # workers>1 の場合はインポート文字列で渡す必要がある
         host="0.0.0.0",
         port=port,
+        workers=workers,
         log_level="info"
     )
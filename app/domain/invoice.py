@@ -22,3 +22,14 @@ class Invoice:
 
     fields: Dict[str, str] = field(default_factory=dict)
     raw_text: str = ""
+
+    @property
+    def has_month_value(self) -> bool:
+        """「○月値」フィールドが1つでも入っているか。
+
+        fields は高々13キー（12ヶ月 + ocr_confidence）なので、
+        都度の走査で実質定数時間。事前計算ビットにしないのは、
+        呼び出し側が fields を丸ごと差し替えるため（古いビットが
+        残る事故を避ける）。
+        """
+        return any(k.endswith("月値") for k in self.fields)
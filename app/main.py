@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse
+
+from .config import load_app_config, init_env, get_project_root
+
+
+def create_app() -> FastAPI:
+    """FastAPIアプリケーションを作成"""
+    # .env 読み込み
+    init_env()
+
+    # config.json 読み込み（後続の処理で使用）
+    cfg = load_app_config()
+
+    # FastAPIアプリ作成
+    app = FastAPI(
+        title="見積プロトタイプ - PDF→Excel自動反映",
+        description="PDFファイルをOCR処理してExcelテンプレートに自動反映するアプリケーション",
+        version="2.0.0"
+    )
+
+    # 静的ファイル配信
+    app.mount("/styles", StaticFiles(directory="app/ui/styles"), name="styles")
+    app.mount("/scripts", StaticFiles(directory="app/ui/scripts"), name="scripts")
+
+    # APIルーター読み込み
+    from .ui.pages.estimate_page import router
+    app.include_router(router, prefix="/api", tags=["estimate"])
+
+    # トップページ
+    @app.get("/", tags=["frontend"])
+    async def root():
+        """メインページを返す"""
+        return FileResponse("app/ui/templates/index.html")
+
+    # マニュアルファイル
+    @app.get("/見積もりアシスト_マニュアル.pdf", tags=["frontend"])
+    async def get_manual():
+        """マニュアルPDFファイルを返す"""
+        from urllib.parse import quote
+        manual_path = get_project_root() / "見積もりアシスト_マニュアル.pdf"
+        filename_encoded = quote("見積もりアシスト_マニュアル.pdf")
+        return FileResponse(
+            str(manual_path),
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"inline; filename*=UTF-8''{filename_encoded}"}
+        )
+
+    return app
+
+
+# FastAPIアプリインスタンス（uvicorn には "app.main:app" で渡す）
+# ルート直下の app.py は app/ パッケージとインポート名が衝突するため、
+# 実体はパッケージ内のこのモジュールに置く
+app = create_app()
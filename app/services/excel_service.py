@@ -4,10 +4,15 @@ from pathlib import Path
 from typing import Dict, List, Any
 
 from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
 
 from ..config import get_project_root
 from ..domain.invoice import Invoice
 
+# 月ごとのセル位置（B21〜M21）。行は21固定、列は「月+1」（1月=B列）で
+# 機械的に決まるので、12エントリのリテラルを手書きせず導出する
+MONTH_CELLS = {m: f"{get_column_letter(m + 1)}21" for m in range(1, 13)}
+
 
 class ExcelService:
     """
@@ -39,7 +44,8 @@ class ExcelService:
         if not template_path.exists():
             return ""
 
-        wb = load_workbook(template_path)
+        # keep_links/rich_text は使っていないのでパースごと省く
+        wb = load_workbook(template_path, keep_links=False, rich_text=False)
         sheet_name = self.cfg.get("excel_cell_map", {}).get("sheet", wb.sheetnames[0])
         ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.active
 
@@ -49,24 +55,8 @@ class ExcelService:
         ws["B2"] = ""
         ws["B4"] = ""
 
-        # 月ごとのセル位置
-        month_cells = {
-            1: "B21",
-            2: "C21",
-            3: "D21",
-            4: "E21",
-            5: "F21",
-            6: "G21",
-            7: "H21",
-            8: "I21",
-            9: "J21",
-            10: "K21",
-            11: "L21",
-            12: "M21",
-        }
-
         # B21〜M21 を一旦すべて空にする
-        for cell in month_cells.values():
+        for cell in MONTH_CELLS.values():
             ws[cell] = ""
 
         # --- 法人情報を書き込む ------------------------------------
@@ -88,17 +78,17 @@ class ExcelService:
             print(f"[デバッグ] Invoice フィールド: {fields}")  # デバッグ出力
             for m in range(1, 13):
                 key = f"{m}月値"
-                if key in fields and month_cells.get(m):
+                if key in fields and MONTH_CELLS.get(m):
                     value = fields[key]
                     # カンマを削除して数値に変換
                     try:
                         numeric_value = int(value.replace(",", ""))
-                        print(f"[デバッグ] {key} = {numeric_value} (数値) をセル {month_cells[m]} に書き込み")
-                        ws[month_cells[m]] = numeric_value
+                        print(f"[デバッグ] {key} = {numeric_value} (数値) をセル {MONTH_CELLS[m]} に書き込み")
+                        ws[MONTH_CELLS[m]] = numeric_value
                     except (ValueError, AttributeError):
                         # 変換失敗時は文字列のまま
-                        print(f"[デバッグ] {key} = {value} (文字列) をセル {month_cells[m]} に書き込み")
-                        ws[month_cells[m]] = value
+                        print(f"[デバッグ] {key} = {value} (文字列) をセル {MONTH_CELLS[m]} に書き込み")
+                        ws[MONTH_CELLS[m]] = value
 
         # ★ 別名で保存してロック回避
         import datetime
@@ -1,22 +1,98 @@
 from __future__ import annotations
 
 import os
-import io
+import re
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
-from azure.core.exceptions import HttpResponseError
-from pdf2image import convert_from_bytes
-from PIL import Image, ImageEnhance, ImageFilter
-import numpy as np
+if TYPE_CHECKING:
+    import numpy as np
 
 from ..domain.invoice import Invoice
+from .pdf_text_service import (
+    extract_page_texts_from_pdf_bytes,
+    extract_text_from_pdf_bytes,
+)
 
 # ロガー設定
 logger = logging.getLogger(__name__)
 
+# OCR結果キャッシュ
+# - キー: (PDFバイト列のblake2bハッシュ, mode, start_month, month_order)
+# - 同じPDFを再アップロード・リトライした場合に Azure 呼び出しを省略する。
+#   OcrService はリクエストごとに生成されるため、モジュールレベルで共有する。
+# - FastAPIのハンドラは並行実行されうるためロックで保護する。
+_OCR_CACHE: Dict[Tuple[str, str, Optional[int], str], Invoice] = {}
+_OCR_CACHE_LOCK = threading.Lock()
+_OCR_CACHE_MAX_ENTRIES = 128
+
+# これ以下のページ数ならプール起動のオーバーヘッドの方が高くつくので逐次処理する
+_PREPROCESS_PARALLEL_THRESHOLD = 2
+
+# kWh抽出で使う正規表現・変換テーブル
+# 複数月モードでは1リクエストにつき最大12回呼ばれるため、
+# パターンのコンパイルとテーブル構築はモジュール読み込み時に1回だけ行う。
+_FULLWIDTH_TRANS = str.maketrans({
+    '０': '0', '１': '1', '２': '2', '３': '3', '４': '4',
+    '５': '5', '６': '6', '７': '7', '８': '8', '９': '9',
+    '，': ',', '、': ',', '　': ' ',
+    'ｋ': 'k', 'Ｋ': 'K',
+    'ｗ': 'w', 'Ｗ': 'W',
+    'ｈ': 'h', 'Ｈ': 'H',
+})
+_KWH_CTX_RE = re.compile(r".{0,50}[kKｋＫ]\s*[wWｗＷ]\s*[hHｈＨ].{0,10}", re.IGNORECASE)
+# kWhパターンを柔軟にマッチング: "kWh", "k Wh", "k  W h" など
+_KWH_LINE_RE = re.compile(r'k\s*[wW]\s*[hH]', re.IGNORECASE)
+_KWH_VAL_RE = re.compile(r'([\d\s,\.]+)\s*[\(\[（]?\s*k\s*[wW]\s*[hH]\s*[\)\]）]?', re.IGNORECASE)
+# 数値候補から空白・カンマ・小数点を1パスで取り除くテーブル
+# （_KWH_VAL_RE のキャプチャは [\d\s,\.] に限定されている）
+_NUM_STRIP_TRANS = str.maketrans('', '', ' \t\r\n\x0b\x0c,.')
+# 日本語文字（ひらがな・カタカナ・漢字）
+_JP_CHAR_RE = re.compile(r'[぀-ゟ゠-ヿ一-鿿]')
+
+# モデル別の analyze パラメータ（日本語認識を明示的に指定）
+# prebuilt-read のみ languages を受け付け、他モデルは locale を使う
+_ANALYZE_LANG_KWARGS: Dict[str, Dict[str, Any]] = {
+    "prebuilt-read": {"languages": ["ja"]},
+}
+_ANALYZE_DEFAULT_LANG_KWARGS: Dict[str, Any] = {"locale": "ja-JP"}
+
+# Azure 呼び出し（ポーリング待ち）用の共有スレッドプール
+# 呼び出しの度に ThreadPoolExecutor を生成するとスレッド起動コストがかかる上、
+# with で抜ける際に負け側のフォールバック試行の完了まで待たされてしまう。
+# プロセスで1つを使い回し、勝者が決まり次第すぐ返す。
+_AZURE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="azure-ocr")
+
+
+def _preprocess_page_array(arr: "np.ndarray") -> "np.ndarray":
+    """
+    1ページ分の画像（ndarray）に前処理フィルタ一式を適用する。
+
+    OpenCVの各関数はGILを解放するため、ThreadPoolExecutorから
+    並列に呼び出せる（プロセスプールのようなバッファのpickle転送も不要）。
+    """
+    import cv2
+
+    # 1. グレースケール化
+    if arr.ndim == 3:
+        arr = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+
+    # 2. コントラスト強調（1.5倍）
+    arr = cv2.convertScaleAbs(arr, alpha=1.5, beta=0)
+
+    # 3. シャープネス調整（アンシャープマスク相当）
+    blurred = cv2.GaussianBlur(arr, (0, 0), sigmaX=1.0)
+    arr = cv2.addWeighted(arr, 1.3, blurred, -0.3, 0)
+
+    # 4. ノイズ除去（メディアンフィルタ）
+    arr = cv2.medianBlur(arr, 3)
+
+    # 5. 階調の正規化（背景色の影響を軽減、autocontrast相当）
+    return cv2.normalize(arr, None, 0, 255, cv2.NORM_MINMAX)
+
 
 class OcrService:
     """
@@ -26,17 +102,26 @@ class OcrService:
     - 複数月モード: 12 / 24 / 36 ページ → 開始月から割り当てて12ヶ月分抽出
 
     の Invoice を生成するサービス。
-    
-    1つのモデル（prebuilt-invoice）のみを使用し、
-    元PDFで失敗した場合は前処理PDFで再試行する。
+
+    後段は result.content と単語confidenceしか使わないため、
+    まず安価で高速な prebuilt-read を試し、
+    テキストが十分に取れない場合のみ prebuilt-invoice で再試行する。
+    モデルごとに元PDFと前処理PDFを並行して試す。
     """
 
     # 試行するモデルの優先順位
     MODELS_TO_TRY = [
-        "prebuilt-invoice",      # 請求書特化
+        "prebuilt-read",         # 汎用OCR（請求書特化モデルより安価・高速）
+        "prebuilt-invoice",      # 請求書特化（readで文字が取れない場合の保険）
     ]
 
     def __init__(self, cfg: Dict[str, Any]) -> None:
+        # Azure SDK はインポートだけで数百msかかるため、
+        # サービス未使用のエンドポイント（トップページ等）の起動を遅らせないよう
+        # ここで初めて読み込む（2回目以降は sys.modules キャッシュで無料）
+        from azure.ai.formrecognizer import DocumentAnalysisClient
+        from azure.core.credentials import AzureKeyCredential
+
         self.cfg = cfg
 
         # 環境変数固定
@@ -55,7 +140,7 @@ class OcrService:
         )
 
         # デフォルトモデル
-        self.model_id: str = cfg.get("FORM_RECOGNIZER_MODEL_ID", "prebuilt-invoice")
+        self.model_id: str = cfg.get("FORM_RECOGNIZER_MODEL_ID", "prebuilt-read")
 
     # --------------------------------------------------------
     # PDF前処理：色付きPDFの改善
@@ -63,76 +148,72 @@ class OcrService:
     def _preprocess_pdf(self, pdf_bytes: bytes) -> bytes:
         """
         色付きPDFを前処理して、OCR精度を向上させる。
-        
+
         処理内容:
         1. PDFを画像に変換
         2. グレースケール化
         3. コントラスト強調
         4. シャープネス調整
         5. 二値化（必要に応じて）
-        6. 画像をPDFに再変換
-        
+        6. 画像をPDF（1ページならPNGのまま）に再変換
+
         Args:
             pdf_bytes: 元のPDFバイト列
-            
+
         Returns:
-            前処理済みPDFバイト列
+            前処理済みバイト列。Azure の begin_analyze_document は画像も
+            受け付けるため、1ページの場合はPDFに包み直さずPNGをそのまま返す。
         """
+        # 前処理が走るのはOCRフォールバック時だけなので、
+        # レンダリング・画像処理系の依存はここで初めて読み込む
+        import cv2
+        import fitz  # PyMuPDF
+        import img2pdf
+        import numpy as np
+
         try:
             logger.info("PDF前処理開始")
-            
-            # PDFを画像に変換（300dpi推奨）
-            images = convert_from_bytes(
-                pdf_bytes,
-                dpi=300,
-                fmt='PNG',
-                grayscale=False  # カラーで読み込んでから処理
-            )
-            
-            processed_images = []
-            
-            for i, img in enumerate(images):
-                logger.info(f"ページ {i+1}/{len(images)} を前処理中...")
-                
-                # 1. グレースケール化
-                if img.mode != 'L':
-                    img = img.convert('L')
-                
-                # 2. コントラスト強調（1.5倍）
-                enhancer = ImageEnhance.Contrast(img)
-                img = enhancer.enhance(1.5)
-                
-                # 3. シャープネス調整
-                enhancer = ImageEnhance.Sharpness(img)
-                img = enhancer.enhance(1.3)
-                
-                # 4. ノイズ除去（メディアンフィルタ）
-                img = img.filter(ImageFilter.MedianFilter(size=3))
-                
-                # 5. 適応的二値化（背景色の影響を軽減）
-                img_array = np.array(img)
-                
-                # Otsuの二値化を適用
-                from PIL import ImageOps
-                img = ImageOps.autocontrast(img, cutoff=2)
-                
-                processed_images.append(img)
-            
-            # 前処理済み画像をPDFに変換
-            pdf_buffer = io.BytesIO()
-            
-            if len(processed_images) == 1:
-                processed_images[0].save(pdf_buffer, format='PDF', resolution=300.0)
+
+            # PDFを画像に変換（DPIはページサイズから自動決定、config.jsonで上書き可）
+            # PyMuPDF はサブプロセスやPNGエンコードを挟まず、共有ライブラリ呼び出しで
+            # 直接メモリ上のピクセルバッファに描画する（pdf2image/Poppler比で数倍速い）。
+            # グレースケール化も MuPDF 内で済ませるので後段の cvtColor が不要になる。
+            arrays: List[np.ndarray] = []
+            with fitz.open(stream=pdf_bytes, filetype='pdf') as doc:
+                dpi = self._pick_preprocess_dpi(doc)
+                for page in doc:
+                    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+                    arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(
+                        pix.height, pix.stride
+                    )[:, :pix.width]
+                    arrays.append(arr)
+
+            if len(arrays) <= _PREPROCESS_PARALLEL_THRESHOLD:
+                # 少ページならプールを立てずに逐次処理
+                processed_arrays = [_preprocess_page_array(arr) for arr in arrays]
             else:
-                processed_images[0].save(
-                    pdf_buffer,
-                    format='PDF',
-                    save_all=True,
-                    append_images=processed_images[1:],
-                    resolution=300.0
-                )
-            
-            processed_pdf = pdf_buffer.getvalue()
+                # CPUバウンドなフィルタ処理を全コアに分散する
+                # （複数月モードの 12/24/36 ページでほぼコア数倍のスループット）
+                logger.info(f"{len(arrays)}ページを並列前処理中...")
+                with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    processed_arrays = list(executor.map(_preprocess_page_array, arrays))
+
+            png_pages: List[bytes] = []
+            for arr in processed_arrays:
+                ok, buf = cv2.imencode('.png', arr)
+                if not ok:
+                    raise ValueError("前処理画像のPNGエンコードに失敗しました")
+                png_pages.append(buf.tobytes())
+
+            # Azure は PNG を直接受け付けるので、1ページならPDFへの包み直しを省略
+            if len(png_pages) == 1:
+                logger.info(f"PDF前処理完了（PNG直送）: {len(pdf_bytes)} → {len(png_pages[0])} bytes")
+                return png_pages[0]
+
+            # 複数ページはPDFコンテナにまとめる
+            # img2pdf はエンコード済み画像をそのままPDFコンテナに包むだけなので、
+            # PILのPDFライターのようなページ毎の再エンコードパスが無い
+            processed_pdf = img2pdf.convert(png_pages)
             logger.info(f"PDF前処理完了: {len(pdf_bytes)} → {len(processed_pdf)} bytes")
             
             return processed_pdf
@@ -141,6 +222,31 @@ class OcrService:
             logger.warning(f"PDF前処理でエラー: {str(e)}, 元のPDFを使用します")
             return pdf_bytes
 
+    def _pick_preprocess_dpi(self, doc: "fitz.Document") -> int:
+        """
+        前処理レンダリングに使うDPIを決める。
+
+        config.json の "OCR_PREPROCESS_DPI" に数値があればそれを使い、
+        省略時（"auto"）は1ページ目のサイズから「長辺が約2000px」になる
+        DPIを計算して 150〜300 にクランプする。A4を一律300dpi（2480×3508px）で
+        描画するとフィルタ処理のピクセル数が必要以上に膨らむため。
+        """
+        setting = self.cfg.get("OCR_PREPROCESS_DPI", "auto")
+        if setting != "auto":
+            try:
+                return int(setting)
+            except (TypeError, ValueError):
+                logger.warning(f"OCR_PREPROCESS_DPI の値が不正です: {setting!r}, auto を使用します")
+
+        try:
+            rect = doc[0].rect
+            long_edge_inch = max(rect.width, rect.height) / 72.0
+            if long_edge_inch <= 0:
+                return 300
+            return max(150, min(300, int(2000 / long_edge_inch)))
+        except Exception:
+            return 300
+
     # --------------------------------------------------------
     # 公開メソッド：単月 / 複数月モードの切り替え
     # --------------------------------------------------------
@@ -152,129 +258,203 @@ class OcrService:
         month_order: str = "ascending",
     ) -> Invoice:
 
-        if mode == "multi":
-            if start_month is None:
-                raise ValueError("複数月モードでは start_month が必須です。")
-            return self._analyze_multi(content, start_month, month_order)
+        if mode == "multi" and start_month is None:
+            raise ValueError("複数月モードでは start_month が必須です。")
 
-        # デフォルトは単月モード
-        return self._analyze_single(content)
+        # キャッシュ確認：同一PDF・同一条件なら Azure を呼ばずに返す
+        # （ハッシュ計算はサブミリ秒、OCRは数秒＋ページ課金）
+        cache_key = (
+            hashlib.blake2b(content, digest_size=16).hexdigest(),
+            mode,
+            start_month,
+            month_order,
+        )
+        with _OCR_CACHE_LOCK:
+            cached = _OCR_CACHE.get(cache_key)
+        if cached is not None:
+            logger.info(f"OCRキャッシュヒット: key={cache_key[0]}, mode={mode}")
+            # 呼び出し側が fields / raw_text を書き換えるためコピーを返す。
+            # 値は不変なstrだけなので、dictを持ち直す浅いクローンで十分
+            # （deepcopyの再帰・メモ化コストを払わない）
+            return self._clone_invoice(cached)
+
+        # テキスト層ファストパス：
+        # born-digital PDF（埋め込みテキストあり）なら Azure を呼ばずに確定できる。
+        # 抽出はミリ秒オーダーで、ヒットすればOCRのレイテンシとAPI課金を丸ごと省ける。
+        invoice = self._try_text_layer(content, mode, start_month, month_order)
+
+        if invoice is None and mode == "multi":
+            invoice = self._analyze_multi(content, start_month, month_order)
+        elif invoice is None:
+            # デフォルトは単月モード
+            invoice = self._analyze_single(content)
+
+        # テキストが取れなかった結果はキャッシュしない
+        # （一時的なAzure側の不調を固定化しないため）
+        if invoice.raw_text:
+            with _OCR_CACHE_LOCK:
+                if len(_OCR_CACHE) >= _OCR_CACHE_MAX_ENTRIES:
+                    # 古いエントリから捨てる（挿入順）
+                    _OCR_CACHE.pop(next(iter(_OCR_CACHE)))
+                _OCR_CACHE[cache_key] = self._clone_invoice(invoice)
+
+        return invoice
+
+    @staticmethod
+    def _clone_invoice(invoice: Invoice) -> Invoice:
+        """キャッシュと呼び出し側で Invoice を共有しないための複製"""
+        return Invoice(fields=dict(invoice.fields), raw_text=invoice.raw_text)
+
+    def analyze_invoices_batch(
+        self,
+        contents: List[bytes],
+        mode: str = "single",
+        start_month: Optional[int] = None,
+        month_order: str = "ascending",
+    ) -> "List[Invoice | Exception]":
+        """
+        複数PDFをまとめてOCRする。
+
+        Azure Document Intelligence には複数ドキュメントを1回の呼び出しで
+        解析するAPIが無いため、「1回のバッチ推論」の代わりに全件を同時に
+        投げてポーリング待ちを重ねる（待ち時間はほぼ最長1件分になる）。
+
+        Returns:
+            入力と同じ順のリスト。失敗したファイルは例外オブジェクトを
+            そのまま格納する（1件の失敗で全体を落とさない）。
+        """
+        if not contents:
+            return []
+
+        # _AZURE_EXECUTOR は analyze_invoice 内部のフォールバック競争でも
+        # 使うため、ここで塞ぐとデッドロックし得る。外側は専用プールで回す。
+        with ThreadPoolExecutor(max_workers=min(4, len(contents))) as executor:
+            futures = [
+                executor.submit(
+                    self.analyze_invoice,
+                    content,
+                    mode=mode,
+                    start_month=start_month,
+                    month_order=month_order,
+                )
+                for content in contents
+            ]
+            results: List[Invoice | Exception] = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+        return results
 
     # --------------------------------------------------------
     # Azure Document Intelligence API 呼び出し（複数モデルでフォールバック）
     # --------------------------------------------------------
+    def _analyze_once(self, model_id: str, content: bytes, label: str) -> Any:
+        """
+        1モデル × 1PDF で Azure OCR を実行する。
+
+        Returns:
+            result: OCR結果（テキストが十分に取れた場合のみ）
+
+        Raises:
+            HttpResponseError: Azure API エラー
+            ValueError: 結果が不十分（文字数が少なすぎる）な場合
+        """
+        logger.info("OCR試行開始（%s）: モデル=%s, PDFサイズ=%d bytes", label, model_id, len(content))
+
+        # 言語指定はモデルごとに事前定義したテーブルから引く
+        analyze_kwargs = {
+            "model_id": model_id,
+            "document": content,
+            **_ANALYZE_LANG_KWARGS.get(model_id, _ANALYZE_DEFAULT_LANG_KWARGS),
+        }
+
+        poller = self.client.begin_analyze_document(**analyze_kwargs)
+        result = poller.result()
+
+        # デバッグ：抽出テキストの内容を確認
+        # （正規表現での全文スキャンはDEBUGが有効なときだけ実行する）
+        if result and result.content and logger.isEnabledFor(logging.DEBUG):
+            content_preview = result.content[:200].replace("\n", "\\n")
+            logger.debug("抽出テキスト（先頭200文字）: %s", content_preview)
+
+            # 日本語文字の検出チェック
+            japanese_chars = _JP_CHAR_RE.findall(result.content)
+            logger.debug("日本語文字数: %d, 総文字数: %d", len(japanese_chars), len(result.content))
+
+        if result and result.content and len(result.content.strip()) > 50:
+            logger.info("OCR成功（%s）: モデル=%s, 抽出文字数=%d", label, model_id, len(result.content))
+            return result
+
+        raise ValueError(
+            f"結果が不十分（文字数={len(result.content) if result and result.content else 0}）"
+        )
+
     def _call_azure_ocr_with_fallback(self, content: bytes) -> Tuple[Any, str]:
         """
-        複数のモデルを順番に試行し、最初に成功したものを返す。
-        元のPDFで失敗した場合、前処理版でも試行する。
-        
+        元PDF・前処理PDFの両系統を並行して試行し、最初に成功したものを返す。
+
+        Azure 呼び出しは数秒かかるI/Oバウンド処理なので、従来の
+        「元PDFで全滅してから前処理版を試す」逐次方式だと失敗パスの
+        レイテンシが T(元) + T(前処理) になる。両方を同時に投げることで
+        max(T(元), T(前処理)) に短縮する。
+
         Returns:
             (result, model_id): OCR結果とモデルID
-        
+
         Raises:
             Exception: すべてのモデルで失敗した場合
         """
+        from azure.core.exceptions import HttpResponseError
+
         errors = []
-        
-        # まず元のPDFで全モデルを試行
-        for model_id in self.MODELS_TO_TRY:
-            try:
-                logger.info(f"OCR試行開始（元PDF）: モデル={model_id}, PDFサイズ={len(content)} bytes")
-                
-                # 日本語認識を明示的に指定
-                analyze_kwargs = {
-                    "model_id": model_id,
-                    "document": content,
-                }
-                
-                # prebuilt-readの場合のみlanguagesパラメータを追加
-                if model_id == "prebuilt-read":
-                    analyze_kwargs["languages"] = ["ja"]
-                else:
-                    analyze_kwargs["locale"] = "ja-JP"
-                
-                poller = self.client.begin_analyze_document(**analyze_kwargs)
-                result = poller.result()
-                
-                # デバッグ：抽出テキストの内容を確認
-                if result and result.content:
-                    content_preview = result.content[:200].replace("\n", "\\n")
-                    logger.info(f"抽出テキスト（先頭200文字）: {content_preview}")
-                    
-                    # 日本語文字の検出チェック
-                    import re
-                    japanese_chars = re.findall(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]', result.content)
-                    logger.info(f"日本語文字数: {len(japanese_chars)}, 総文字数: {len(result.content)}")
-                
-                if result and result.content and len(result.content.strip()) > 50:
-                    logger.info(f"OCR成功（元PDF）: モデル={model_id}, 抽出文字数={len(result.content)}")
-                    return result, model_id
-                else:
-                    msg = f"{model_id}(元PDF): 結果が不十分（文字数={len(result.content) if result and result.content else 0}）"
-                    logger.warning(msg)
-                    errors.append(msg)
-                    
-            except HttpResponseError as e:
-                error_msg = f"{model_id}(元PDF): HTTP {e.status_code} - {e.message}"
-                logger.warning(f"OCR失敗: {error_msg}")
-                errors.append(error_msg)
-                
-            except Exception as e:
-                error_msg = f"{model_id}(元PDF): {type(e).__name__} - {str(e)}"
-                logger.warning(f"OCR失敗: {error_msg}")
-                errors.append(error_msg)
-        
-        # 元のPDFで全て失敗 → 前処理版で再試行
-        logger.info("元PDFで失敗したため、前処理版PDFで再試行します...")
-        preprocessed_content = self._preprocess_pdf(content)
-        
+
+        # 前処理PDFは1回だけ生成して全モデルで共有する
+        preprocessed: Dict[str, bytes] = {}
+        preprocess_lock = threading.Lock()
+
+        def _preprocessed_content() -> bytes:
+            with preprocess_lock:
+                if "pdf" not in preprocessed:
+                    preprocessed["pdf"] = self._preprocess_pdf(content)
+                return preprocessed["pdf"]
+
+        def _run_preprocessed(model_id: str) -> Any:
+            return self._analyze_once(model_id, _preprocessed_content(), "前処理PDF")
+
+        # モデルは優先順（安価な順）に逐次、各モデル内では元PDFと前処理PDFを並行。
+        # 高価な後続モデルは前段が全滅したときしか呼ばないので、成功パスの課金は増えない。
         for model_id in self.MODELS_TO_TRY:
-            try:
-                logger.info(f"OCR試行開始（前処理PDF）: モデル={model_id}")
-                
-                # 日本語認識を明示的に指定
-                analyze_kwargs = {
-                    "model_id": model_id,
-                    "document": preprocessed_content,
-                }
-                
-                # prebuilt-readの場合のみlanguagesパラメータを追加
-                if model_id == "prebuilt-read":
-                    analyze_kwargs["languages"] = ["ja"]
-                else:
-                    analyze_kwargs["locale"] = "ja-JP"
-                
-                poller = self.client.begin_analyze_document(**analyze_kwargs)
-                result = poller.result()
-                
-                # デバッグ：抽出テキストの内容を確認
-                if result and result.content:
-                    content_preview = result.content[:200].replace("\n", "\\n")
-                    logger.info(f"抽出テキスト（先頭200文字）: {content_preview}")
-                    
-                    # 日本語文字の検出チェック
-                    import re
-                    japanese_chars = re.findall(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]', result.content)
-                    logger.info(f"日本語文字数: {len(japanese_chars)}, 総文字数: {len(result.content)}")
-                
-                if result and result.content and len(result.content.strip()) > 50:
-                    logger.info(f"OCR成功（前処理PDF）: モデル={model_id}, 抽出文字数={len(result.content)}")
-                    return result, f"{model_id}(前処理)"
-                else:
-                    msg = f"{model_id}(前処理PDF): 結果が不十分（文字数={len(result.content) if result and result.content else 0}）"
-                    logger.warning(msg)
-                    errors.append(msg)
-                    
-            except HttpResponseError as e:
-                error_msg = f"{model_id}(前処理PDF): HTTP {e.status_code} - {e.message}"
-                logger.warning(f"OCR失敗: {error_msg}")
-                errors.append(error_msg)
-                
-            except Exception as e:
-                error_msg = f"{model_id}(前処理PDF): {type(e).__name__} - {str(e)}"
-                logger.warning(f"OCR失敗: {error_msg}")
-                errors.append(error_msg)
-        
+            futures: Dict[Any, Tuple[str, str]] = {
+                _AZURE_EXECUTOR.submit(self._analyze_once, model_id, content, "元PDF"): (model_id, "元PDF"),
+                _AZURE_EXECUTOR.submit(_run_preprocessed, model_id): (model_id, "前処理PDF"),
+            }
+
+            for fut in as_completed(futures):
+                fut_model, label = futures[fut]
+                try:
+                    result = fut.result()
+
+                    # 勝者が決まったら未開始の試行はキャンセル
+                    # （実行中の負け側は共有プール上で勝手に終わるのを待たずに返す）
+                    for other in futures:
+                        if other is not fut:
+                            other.cancel()
+
+                    used_model = f"{fut_model}(前処理)" if label == "前処理PDF" else fut_model
+                    return result, used_model
+
+                except HttpResponseError as e:
+                    error_msg = f"{fut_model}({label}): HTTP {e.status_code} - {e.message}"
+                    logger.warning(f"OCR失敗: {error_msg}")
+                    errors.append(error_msg)
+
+                except Exception as e:
+                    error_msg = f"{fut_model}({label}): {type(e).__name__} - {str(e)}"
+                    logger.warning(f"OCR失敗: {error_msg}")
+                    errors.append(error_msg)
+
         # すべてのモデル（元PDF+前処理PDF）で失敗
         error_summary = "\n".join([f"  - {err}" for err in errors])
         raise Exception(
@@ -300,16 +480,7 @@ class OcrService:
             logger.info(f"単月モード解析完了: モデル={used_model}, 文字数={len(full_text)}")
             
             # 信頼度を計算（全単語の平均confidence）
-            total_confidence = 0
-            word_count = 0
-            for page in result.pages:
-                if hasattr(page, 'words') and page.words:
-                    for word in page.words:
-                        if hasattr(word, 'confidence') and word.confidence is not None:
-                            total_confidence += word.confidence
-                            word_count += 1
-            
-            average_confidence = total_confidence / word_count if word_count > 0 else 0
+            average_confidence = self._average_confidence(result)
             logger.info(f"OCR平均信頼度: {average_confidence:.2f}")
             
             # 月の割り当てはUI側で行うため、ここではraw_textと信頼度を返す
@@ -331,39 +502,34 @@ class OcrService:
         try:
             result, used_model = self._call_azure_ocr_with_fallback(content)
             
-            # ✅ ページごとのテキストは result.content から spans で切り出す
-            page_texts: List[str] = []
             full_content = result.content or ""
-            
+
             if not full_content.strip():
                 logger.error("OCRでテキストを抽出できませんでした")
                 raise ValueError("PDFからテキストを抽出できませんでした。画像のみのPDFの可能性があります。")
 
             # 信頼度を計算（全単語の平均confidence）
-            total_confidence = 0
-            word_count = 0
-            for page in result.pages:
-                if hasattr(page, 'words') and page.words:
-                    for word in page.words:
-                        if hasattr(word, 'confidence') and word.confidence is not None:
-                            total_confidence += word.confidence
-                            word_count += 1
-
-            average_confidence = total_confidence / word_count if word_count > 0 else 0
+            average_confidence = self._average_confidence(result)
             logger.info(f"OCR平均信頼度: {average_confidence:.2f}")
 
+            # ✅ ページごとの位置は spans の (offset, length) だけ記録しておき、
+            #    文字列の実体化は月単位の1スライスで行う
+            #    （ページ毎に str コピーを作ると36ページ分の余計なアロケーションになる）
+            spans: List[Tuple[int, int]] = []
+            prev_end = 0
             for page in result.pages:
                 if page.spans:
-                    # 通常1ページ1spanなので先頭だけ取ればOK
                     span = page.spans[0]
-                    start = span.offset
-                    end = span.offset + span.length
-                    page_texts.append(full_content[start:end])
+                    spans.append((span.offset, span.length))
+                    prev_end = span.offset + span.length
                 else:
-                    page_texts.append("")
+                    # スパンの無い空白ページは「直前ページの終端に長さ0」として置く。
+                    # (0, 0) にすると、月グループの末尾なら full_content[start:0] で
+                    # 月テキストが空に、先頭なら文書頭からのスライスになり
+                    # 前の月の値を拾ってしまう（24/36枚スキャンの仕切り白紙で起きる）
+                    spans.append((prev_end, 0))
+            num_pages = len(spans)
 
-            num_pages = len(page_texts)
-            
             logger.info(f"複数月モード解析完了: モデル={used_model}, ページ数={num_pages}")
 
             if num_pages not in (12, 24, 36):
@@ -372,62 +538,184 @@ class OcrService:
                 )
 
             pages_per_month = num_pages // 12  # 12→1、24→2、36→3
-            fields: Dict[str, str] = {}
 
-            fields["ocr_confidence"] = average_confidence
+            # Azure はページ順に連続した offset を返すため、
+            # 月のテキストは先頭ページの開始〜末尾ページの終了の1スライスで取れる
+            month_texts: List[str] = []
+            for i in range(12):
+                start_off = spans[i * pages_per_month][0]
+                last_off, last_len = spans[(i + 1) * pages_per_month - 1]
+                month_texts.append(full_content[start_off:last_off + last_len])
 
-            current_month = start_month
+            fields: Dict[str, str] = {"ocr_confidence": average_confidence}
+            fields.update(self._assign_months(month_texts, start_month, month_order))
 
-            for i in range(12):
-                start_idx = i * pages_per_month
-                end_idx = start_idx + pages_per_month
-                month_text = "\n".join(page_texts[start_idx:end_idx])
-
-                # kWh 抽出（単月と同じロジック）
-                kwh_value = self._extract_kwh_from_text(month_text)
-                if kwh_value:
-                    # ★ -1 のオフセットを削除: start_month=10なら10月として扱う
-                    fields[f"{current_month}月値"] = kwh_value
-
-                # 月の進め方を month_order に応じて切り替え
-                if month_order == "descending":
-                    current_month = self._prev_month(current_month)
-                else:
-                    current_month = self._next_month(current_month)
+            return Invoice(fields=fields, raw_text=full_content)
 
-            full_text = "\n".join(page_texts)
-            return Invoice(fields=fields, raw_text=full_text)
-            
         except Exception as e:
             logger.error(f"複数月モード解析エラー: {str(e)}", exc_info=True)
             raise
 
+    def _build_multi_invoice(
+        self,
+        page_texts: List[str],
+        average_confidence: float,
+        start_month: int,
+        month_order: str = "ascending",
+    ) -> Invoice:
+        """ページごとのテキストから12ヶ月分の Invoice を組み立てる"""
+        num_pages = len(page_texts)
+
+        if num_pages not in (12, 24, 36):
+            raise ValueError(
+                f"ページ枚数が違います。複数月モードは 12枚 / 24枚 / 36枚 のみ対応しています（実際: {num_pages}枚）"
+            )
+
+        pages_per_month = num_pages // 12  # 12→1、24→2、36→3
+        month_texts = [
+            "\n".join(page_texts[i * pages_per_month:(i + 1) * pages_per_month])
+            for i in range(12)
+        ]
+
+        fields: Dict[str, str] = {"ocr_confidence": average_confidence}
+        fields.update(self._assign_months(month_texts, start_month, month_order))
+
+        full_text = "\n".join(page_texts)
+        return Invoice(fields=fields, raw_text=full_text)
+
+    def _assign_months(self, month_texts: List[str], start_month: int, month_order: str) -> Dict[str, str]:
+        """月ごとのテキストから kWh を抽出し、「○月値」フィールドに割り当てる"""
+        fields: Dict[str, str] = {}
+        current_month = start_month
+
+        for month_text in month_texts:
+            # kWh 抽出（単月と同じロジック）
+            kwh_value = self._extract_kwh_from_text(month_text)
+            if kwh_value:
+                # ★ -1 のオフセットを削除: start_month=10なら10月として扱う
+                fields[f"{current_month}月値"] = kwh_value
+
+            # 月の進め方を month_order に応じて切り替え
+            if month_order == "descending":
+                current_month = self._prev_month(current_month)
+            else:
+                current_month = self._next_month(current_month)
+
+        return fields
+
+    # --------------------------------------------------------
+    # テキスト層ファストパス：born-digital PDF は OCR 不要
+    # --------------------------------------------------------
+    def _try_text_layer(
+        self,
+        content: bytes,
+        mode: str,
+        start_month: Optional[int],
+        month_order: str,
+    ) -> Optional[Invoice]:
+        """
+        埋め込みテキスト層から Invoice を組み立てられる場合はそれを返す。
+
+        テキスト層はOCRと違い文字化けしない正確なデータなので信頼度1.0扱い。
+        kWh が取れない・ページ構成が合わない場合は None を返し、
+        通常の Azure OCR パスに委ねる。
+        """
+        if mode == "multi":
+            page_texts = extract_page_texts_from_pdf_bytes(content)
+            if len(page_texts) not in (12, 24, 36):
+                return None
+            if self._looks_garbled("".join(page_texts)):
+                return None
+            try:
+                invoice = self._build_multi_invoice(page_texts, 1.0, start_month, month_order)
+            except ValueError:
+                return None
+            # 12ヶ月すべて抽出できた場合のみ採用（欠けがあればOCRで再挑戦）
+            month_keys = [k for k in invoice.fields if k.endswith("月値")]
+            if len(month_keys) < 12:
+                logger.info(f"テキスト層では{len(month_keys)}/12ヶ月しか取れず、OCRにフォールバック")
+                return None
+            logger.info("テキスト層ファストパス採用（複数月）: Azure OCR をスキップ")
+            return invoice
+
+        # 単月モード
+        text = extract_text_from_pdf_bytes(content)
+        if not text:
+            return None
+        if self._looks_garbled(text):
+            return None
+        if not self._extract_kwh_from_text(text):
+            return None
+        logger.info("テキスト層ファストパス採用（単月）: Azure OCR をスキップ")
+        return Invoice(fields={"ocr_confidence": 1.0}, raw_text=text)
+
+    @staticmethod
+    def _looks_garbled(text: str) -> bool:
+        """
+        テキスト層が文字化けしているか（CIDマップ欠損など）を判定する。
+
+        壊れたフォント埋め込みのPDFでは抽出結果がU+FFFD（置換文字）だらけに
+        なる。その場合はテキスト層を信用せずOCRに回す。
+        """
+        if not text:
+            return True
+        if text.count("�") / len(text) > 0.05:
+            logger.info("テキスト層が文字化けしているためOCRにフォールバック")
+            return True
+        return False
+
+    # --------------------------------------------------------
+    # OCR信頼度：全単語の平均confidence
+    # --------------------------------------------------------
+    @staticmethod
+    def _average_confidence(result: Any) -> float:
+        """
+        全単語の平均confidenceを計算する。
+
+        純Pythonの二重ループだと36ページの密なPDFで数万回の属性アクセスに
+        なるため、ジェネレータからNumPy配列へ一括変換して mean() で潰す。
+        """
+        import numpy as np
+
+        confs = np.fromiter(
+            (
+                word.confidence
+                for page in result.pages if page.words
+                for word in page.words if word.confidence is not None
+            ),
+            dtype=np.float32,
+        )
+        return float(confs.mean()) if confs.size else 0.0
+
     # --------------------------------------------------------
     # kWh 抽出（4桁以上限定 + カンマ後スペース対応）
     # --------------------------------------------------------
     @staticmethod
     def _extract_kwh_from_text(text: str) -> str:
-        import re
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
-        logger.info(f"=== kWh抽出開始 ===")
-        logger.info(f"テキスト全体（先頭500文字）:\n{text[:500]}")
+        if debug_enabled:
+            logger.debug("=== kWh抽出開始 ===")
+            logger.debug("テキスト全体（先頭500文字）:\n%s", text[:500])
         
         # 全角を半角に統一（数字、カンマ、スペース、kWh）
-        text = text.translate(str.maketrans({
-            '０': '0', '１': '1', '２': '2', '３': '3', '４': '4',
-            '５': '5', '６': '6', '７': '7', '８': '8', '９': '9',
-            '，': ',', '、': ',', '　': ' ',
-            'ｋ': 'k', 'ｋ': 'k', 'Ｋ': 'K',
-            'ｗ': 'w', 'ｗ': 'w', 'Ｗ': 'W',
-            'ｈ': 'h', 'ｈ': 'h', 'Ｈ': 'H',
-        }))
-        
+        text = text.translate(_FULLWIDTH_TRANS)
+
+        # 速攻リジェクト：'k' が1文字も無いテキストに kWh 表記はあり得ない。
+        # str.__contains__ はC実装の1パス走査なので、行分割＋正規表現の
+        # スキャンに入る前にほぼタダで除外できる
+        if "k" not in text and "K" not in text:
+            logger.error("❌ kWh未検出（kWh表記を含まないテキスト）")
+            return ""
+
         # デバッグ：kWh周辺のテキストを可視化（全角対応前後）
-        kwh_contexts = re.findall(r".{0,50}[kKｋＫ]\s*[wWｗＷ]\s*[hHｈＨ].{0,10}", text, flags=re.IGNORECASE)
-        logger.info(f"=== kWh周辺テキスト（全{len(kwh_contexts)}箇所）===")
-        for i, ctx in enumerate(kwh_contexts, 1):
-            visible = ctx.replace(" ", "␣").replace("\n", "↵").replace("\r", "⏎").replace("\t", "⇥").replace(",", "⸴")
-            logger.info(f"  [{i}] {visible}")
+        # 全文に対する正規表現スキャンなのでDEBUG時のみ実行
+        if debug_enabled:
+            kwh_contexts = _KWH_CTX_RE.findall(text)
+            logger.debug("=== kWh周辺テキスト（全%d箇所）===", len(kwh_contexts))
+            for i, ctx in enumerate(kwh_contexts, 1):
+                visible = ctx.replace(" ", "␣").replace("\n", "↵").replace("\r", "⏎").replace("\t", "⇥").replace(",", "⸴")
+                logger.debug("  [%d] %s", i, visible)
         
         # 【重要】複数の改行パターンに対応（\r\n, \n, \r）
         # まず統一的な改行に変換
@@ -436,47 +724,41 @@ class OcrService:
         # 改行で分割してkWhを含む行だけを抽出（スペースで分割されている場合も対応）
         lines = normalized_text.split('\n')
         
-        # kWhパターンを柔軟にマッチング: "kWh", "k Wh", "k  W h" など
-        kwh_pattern = r'k\s*[wW]\s*[hH]'
-        kwh_lines = [line for line in lines if re.search(kwh_pattern, line, re.IGNORECASE)]
+        kwh_lines = [line for line in lines if _KWH_LINE_RE.search(line)]
         
-        logger.info(f"=== kWhを含む行（全{len(kwh_lines)}行）===")
+        if debug_enabled:
+            logger.debug("=== kWhを含む行（全%d行）===", len(kwh_lines))
         
         all_nums = []
         
         for i, line in enumerate(kwh_lines, 1):
-            line_visible = line.replace(" ", "␣").replace(",", "⸴")
-            logger.info(f"  [{i}] 行: '{line_visible}'")
+            if debug_enabled:
+                logger.debug("  [%d] 行: '%s'", i, line.replace(" ", "␣").replace(",", "⸴"))
             
             # この行から "数値 k Wh" のパターンを抽出
             # 例: "207,624kWh" → "207,624"
             # 例: "284,077 k Wh" → "284,077"
             # 例: "2,915 (kWh)" → "2,915"
             # 例: "2,915（kWh）" → "2,915" (全角括弧)
-            match = re.search(r'([\d\s,\.]+)\s*[\(\[（]?\s*k\s*[wW]\s*[hH]\s*[\)\]）]?', line, flags=re.IGNORECASE)
+            match = _KWH_VAL_RE.search(line)
             
             if not match:
-                logger.warning(f"  [{i}] スキップ（パターンなし）")
+                if debug_enabled:
+                    logger.debug("  [%d] スキップ（パターンなし）", i)
                 continue
             
             raw = match.group(1).strip()
-            
-            # スペースを削除（例: "284 077" → "284077"）
-            raw_no_space = raw.replace(' ', '')
-            
-            # カンマの後のスペースを削除（例: "14, 662" → "14,662"）
-            raw_normalized = re.sub(r',\s+', ',', raw_no_space)
-            
-            # 数字とカンマ以外を削除
-            cleaned = re.sub(r'[^\d,]', '', raw_normalized)
-            
-            # カンマを削除して純粋な数値に
-            final_num_str = cleaned.replace(',', '')
-            
-            logger.info(f"  [{i}] 元: '{raw}' → スペース除去: '{raw_no_space}' → 正規化: '{raw_normalized}' → 数値: '{final_num_str}'")
-            
+
+            # 空白・カンマ・小数点をまとめて除去して純粋な数値に
+            # （例: "284 077" / "14, 662" / "207,624" → "284077" / "14662" / "207624"）
+            final_num_str = raw.translate(_NUM_STRIP_TRANS)
+
+            if debug_enabled:
+                logger.debug("  [%d] 元: '%s' → 数値: '%s'", i, raw, final_num_str)
+
             if not final_num_str:
-                logger.warning(f"  [{i}] スキップ（空）")
+                if debug_enabled:
+                    logger.debug("  [%d] スキップ（空）", i)
                 continue
             
             try:
@@ -484,32 +766,45 @@ class OcrService:
                 
                 # kWhは最低4桁以上（999以下は無視）
                 if v < 1000:
-                    logger.warning(f"  [{i}] スキップ（3桁以下: {v}）")
+                    if debug_enabled:
+                        logger.debug("  [%d] スキップ（3桁以下: %d）", i, v)
                     continue
-                
+
                 all_nums.append(v)
-                logger.info(f"  [{i}] ✓ 有効: {v}")
-                
+                if debug_enabled:
+                    logger.debug("  [%d] ✓ 有効: %d", i, v)
+
+                # 早期打ち切り：候補が1件だけで月次kWhとして妥当なレンジにあり、
+                # かつ kWh行の3割以上を走査済みなら、残り行のスキャンを省略する
+                # （複数候補が出た場合は従来どおり全行を見て最大値を採る）
+                if (
+                    len(all_nums) == 1
+                    and 1000 <= v <= 9_999_999
+                    and i >= max(1, int(len(kwh_lines) * 0.3))
+                ):
+                    if debug_enabled:
+                        logger.debug("  [%d] 早期確定: %d（残り%d行をスキップ）", i, v, len(kwh_lines) - i)
+                    break
+
             except Exception as e:
-                logger.warning(f"  [{i}] エラー: {e}")
+                logger.warning("  [%d] エラー: %s", i, e)
         
         if not all_nums:
             logger.error("❌ kWh未検出（4桁以上の値がありません）")
             # より詳細なデバッグ情報
-            logger.error(f"改行で分割した行数: {len(lines)}")
-            logger.error(f"kWhを含む行数: {len(kwh_lines)}")
+            logger.error("改行で分割した行数: %d", len(lines))
+            logger.error("kWhを含む行数: %d", len(kwh_lines))
             if kwh_lines:
-                logger.error(f"kWhを含む行の例: {kwh_lines[:3]}")
+                logger.error("kWhを含む行の例: %s", kwh_lines[:3])
             return ""
         
-        # 重複除去して最大値を採用
-        unique_nums = sorted(list(set(all_nums)), reverse=True)
-        max_val = unique_nums[0]
-        
-        logger.info(f"=== 最終結果 ===")
-        logger.info(f"  全候補: {all_nums}")
-        logger.info(f"  ユニーク（降順）: {unique_nums}")
-        logger.info(f"  ✅ 採用: {max_val}")
+        # 最大値を採用（ソートせず1パスで求める）
+        max_val = max(all_nums)
+
+        if debug_enabled:
+            logger.debug("=== 最終結果 ===")
+            logger.debug("  全候補: %s", all_nums)
+        logger.info("kWh採用値: %d（候補%d件）", max_val, len(all_nums))
         
         return str(max_val)
 
@@ -1,9 +1,7 @@
 from __future__ import annotations
 
 import logging
-from io import BytesIO
-
-from pdfminer.high_level import extract_text
+from typing import List
 
 logger = logging.getLogger(__name__)
 
@@ -11,11 +9,33 @@ logger = logging.getLogger(__name__)
 def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
     """Extract embedded text layer from a PDF.
 
+    Uses PyMuPDF's native text extractor, which is one to two orders of
+    magnitude faster than pure-Python pdfminer on multi-page invoices.
+
     Returns empty string if extraction fails or no text exists.
     """
     try:
-        text = extract_text(BytesIO(pdf_bytes)) or ""
+        import fitz  # PyMuPDF
+
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            text = "\n".join(page.get_text("text") for page in doc)
         return text.strip()
     except Exception as e:
         logger.warning(f"PDFテキスト抽出に失敗: {e}")
         return ""
+
+
+def extract_page_texts_from_pdf_bytes(pdf_bytes: bytes) -> List[str]:
+    """Extract embedded text layer page by page.
+
+    Returns one string per page (possibly empty), or an empty list
+    if extraction fails entirely.
+    """
+    try:
+        import fitz  # PyMuPDF
+
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            return [page.get_text("text").strip() for page in doc]
+    except Exception as e:
+        logger.warning(f"PDFページ別テキスト抽出に失敗: {e}")
+        return []
@@ -14,6 +14,31 @@ from ..services.excel_service import ExcelService
 # ------------------------------------------------------------
 # ファイル名から月を自動検出
 # ------------------------------------------------------------
+# パターンと変換テーブルはアップロードファイル毎に呼ばれるため、
+# モジュール読み込み時に1回だけコンパイル・構築する
+_MONTH_KANJI_RE = re.compile(r'([0-9０-９]{1,2})\s*月')
+_MONTH_SEP_RE = re.compile(r'[_\-]([0-9]{2})[_\-\.]')
+_ZEN2HAN = str.maketrans('０１２３４５６７８９', '0123456789')
+
+# 英語の月名。24個の部分文字列検索を繰り返す代わりに、1本の選択肢
+# （長い名前を先に置く）にまとめてファイル名を1回だけ走査する
+_MONTH_EN_RE = re.compile(
+    r'january|february|march|april|august|september|october|november|december'
+    r'|june|july|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec',
+    re.IGNORECASE,
+)
+_MONTH_EN_PREFIX = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+# 結果プレビューとしてセッションに保持するOCRテキストの上限文字数
+_TEXT_PREVIEW_CHARS = 4000
+
+# ファイル名に使えない文字を1パスで除去するための変換テーブル
+_INVALID_FN_TBL = str.maketrans('', '', r'\/:*?"<>|')
+
+
 def _detect_month_from_filename(filename: str) -> Optional[int]:
     """
     ファイル名から月を自動検出する。
@@ -29,43 +54,26 @@ def _detect_month_from_filename(filename: str) -> Optional[int]:
         検出された月（1-12）、検出できない場合はNone
     """
     # パターン1: "1月" "01月" "１月"などの形式
-    match = re.search(r'([0-9０-９]{1,2})\s*月', filename)
+    match = _MONTH_KANJI_RE.search(filename)
     if match:
-        month_str = match.group(1)
         # 全角数字を半角に変換
-        month_str = month_str.translate(str.maketrans('０１２３４５６７８９', '0123456789'))
+        month_str = match.group(1).translate(_ZEN2HAN)
         month = int(month_str)
         if 1 <= month <= 12:
             return month
-    
+
     # パターン2: "_01_" "2025-01" "-01." などの形式
-    match = re.search(r'[_\-]([0-9]{2})[_\-\.]', filename)
+    match = _MONTH_SEP_RE.search(filename)
     if match:
         month = int(match.group(1))
         if 1 <= month <= 12:
             return month
-    
-    # パターン3: 英語の月名
-    month_names = {
-        'jan': 1, 'january': 1,
-        'feb': 2, 'february': 2,
-        'mar': 3, 'march': 3,
-        'apr': 4, 'april': 4,
-        'may': 5,
-        'jun': 6, 'june': 6,
-        'jul': 7, 'july': 7,
-        'aug': 8, 'august': 8,
-        'sep': 9, 'september': 9,
-        'oct': 10, 'october': 10,
-        'nov': 11, 'november': 11,
-        'dec': 12, 'december': 12,
-    }
-    
-    filename_lower = filename.lower()
-    for name, month in month_names.items():
-        if name in filename_lower:
-            return month
-    
+
+    # パターン3: 英語の月名（1スキャンで検出し、先頭3文字で月に引き当てる）
+    match = _MONTH_EN_RE.search(filename)
+    if match:
+        return _MONTH_EN_PREFIX[match.group(0).lower()[:3]]
+
     return None
 
 
@@ -90,9 +98,7 @@ def _build_excel_filename() -> str:
     if not corp_name:
         return "output.xlsx"
 
-    invalid_chars = r'\\/:*?"<>|'
-    for ch in invalid_chars:
-        corp_name = corp_name.replace(ch, "")
+    corp_name = corp_name.translate(_INVALID_FN_TBL)
     if not corp_name:
         corp_name = "output"
 
@@ -161,16 +167,24 @@ def render_main_page(cfg: Dict[str, Any]) -> None:
         )
 
         if pdf_files is not None and len(pdf_files) > 0:
-            st.session_state.pdf_files = []
-            st.session_state.output_file = ""
-
+            # Streamlitはウィジェット操作のたびにスクリプトを再実行するため、
+            # 毎回リストを作り直すと全PDFの read() がrerunごとに走る。
+            # (名前, サイズ) で前回のエントリと突き合わせ、変化したファイル
+            # だけ読み込む。既存エントリは処理状態ごと引き継がれる
+            prev_entries = {
+                (e["name"], e.get("size")): e for e in st.session_state.pdf_files
+            }
+            entries = []
+            has_new_file = False
             for f in pdf_files:
-                # ファイル名から月を自動推定
-                detected_month = _detect_month_from_filename(f.name)
-                
-                st.session_state.pdf_files.append(
-                    {
+                entry = prev_entries.get((f.name, f.size))
+                if entry is None:
+                    has_new_file = True
+                    # ファイル名から月を自動推定
+                    detected_month = _detect_month_from_filename(f.name)
+                    entry = {
                         "name": f.name,
+                        "size": f.size,
                         "status": "未処理",
                         "invoice": None,
                         "text": "",
@@ -178,7 +192,11 @@ def render_main_page(cfg: Dict[str, Any]) -> None:
                         "detected_month": detected_month,  # 自動検出した月
                         "selected_month": detected_month,  # ユーザーが選択する月
                     }
-                )
+                entries.append(entry)
+
+            if has_new_file or len(entries) != len(st.session_state.pdf_files):
+                st.session_state.pdf_files = entries
+                st.session_state.output_file = ""
         else:
             st.session_state.pdf_files = []
             st.session_state.output_file = ""
@@ -254,55 +272,87 @@ def _run_ocr_and_fill_excel(
     st.session_state.output_file = ""
 
     invoices: List[Invoice] = []
+    # ローカルのリスト上で更新を積み、最後に1回だけ書き戻す
+    # （session_stateへのキー単位の書き込みを繰り返さない）
+    pdf_files = list(st.session_state.pdf_files)
+
+    # OCR（Azure呼び出し）は全件まとめてバッチ実行する。
+    # 待ち時間のほとんどがAzureのポーリングなので、同時に投げれば
+    # 合計時間はほぼ「最も遅い1件分」になる。
+    # st.* はワーカースレッドから呼べないため、OCRだけを並列化し、
+    # 結果の反映・表示はメインスレッドで元の順番どおりに行う。
+    for file_info in pdf_files:
+        file_info["status"] = "処理中"
+
+    # OCR済みエントリはバイト列を解放済みなので、前回のInvoiceを
+    # そのまま再利用し、バイト列が残っているものだけOCRに回す
+    outcomes: Dict[int, Any] = {
+        idx: file_info["invoice"]
+        for idx, file_info in enumerate(pdf_files)
+        if file_info["bytes"] is None
+    }
+    pending = [
+        (idx, file_info["bytes"])
+        for idx, file_info in enumerate(pdf_files)
+        if file_info["bytes"] is not None
+    ]
+
+    if pending:
+        with st.spinner(f"🔄 {len(pending)}件のPDFをOCR実行中…"):
+            batch_results = ocr_service.analyze_invoices_batch(
+                [content for _, content in pending],
+                mode=mode,
+                start_month=start_month if mode == "multi" else None,
+            )
+        for (idx, _), result in zip(pending, batch_results):
+            outcomes[idx] = result
 
-    for idx, file_info in enumerate(st.session_state.pdf_files):
-        st.session_state.pdf_files[idx]["status"] = "処理中"
-        with st.spinner(f"🔄 {file_info['name']} をOCR実行中…"):
-            try:
-                # 単月モードの場合、ユーザーが選択した月を使用
-                if mode == "single":
-                    selected_month = file_info.get('selected_month')
-                    # OCRでテキストを取得
-                    invoice = ocr_service.analyze_invoice(
-                        file_info["bytes"],
-                        mode=mode,
-                        start_month=None,
-                    )
-                    
-                    # OCRテキストから直接kWh値を抽出
-                    if selected_month and invoice.raw_text:
-                        from ..services.ocr_service import OcrService
-                        kwh_value = OcrService._extract_kwh_from_text(invoice.raw_text)
-                        
-                        if kwh_value:
-                            # ユーザーが選択した月にkWh値を設定
-                            invoice.fields = {f"{selected_month}月値": kwh_value}
-                        else:
-                            # kWh値が抽出できない
-                            invoice.fields = {}
-                            st.warning(f"⚠️ {file_info['name']} からkWh値を抽出できませんでした")
-                else:
-                    # 複数月モードの場合は従来通り
-                    invoice = ocr_service.analyze_invoice(
-                        file_info["bytes"],
-                        mode=mode,
-                        start_month=start_month,
-                    )
+    for idx, file_info in enumerate(pdf_files):
+        outcome = outcomes[idx]
+        if not isinstance(outcome, Invoice):
+            file_info["status"] = "エラー"
+            st.error(f"❌ エラー: {str(outcome)}")
+            continue
 
-                st.session_state.pdf_files[idx]["status"] = "完了"
-                st.session_state.pdf_files[idx]["invoice"] = invoice
-                st.session_state.pdf_files[idx]["text"] = invoice.raw_text or ""
+        invoice = outcome
 
-                invoices.append(invoice)
+        # 単月モードの場合、ユーザーが選択した月を使用
+        if mode == "single":
+            selected_month = file_info.get('selected_month')
 
-                # デバッグ情報：抽出結果を表示
-                month_info = f"（{file_info.get('selected_month')}月分）" if mode == "single" else ""
-                fields_info = f" - フィールド: {invoice.fields}" if invoice.fields else " - フィールド: なし"
-                st.success(f"✅ {file_info['name']} {month_info}の処理が完了しました{fields_info}")
+            # OCRテキストから直接kWh値を抽出
+            if selected_month and invoice.raw_text:
+                kwh_value = OcrService._extract_kwh_from_text(invoice.raw_text)
 
-            except Exception as e:
-                st.session_state.pdf_files[idx]["status"] = "エラー"
-                st.error(f"❌ エラー: {str(e)}")
+                if kwh_value:
+                    # ユーザーが選択した月にkWh値を設定
+                    invoice.fields = {f"{selected_month}月値": kwh_value}
+                else:
+                    # kWh値が抽出できない
+                    invoice.fields = {}
+                    st.warning(f"⚠️ {file_info['name']} からkWh値を抽出できませんでした")
+
+        file_info["status"] = "完了"
+        file_info["invoice"] = invoice
+        # プレビュー用テキストは先頭だけ保持する（全文を抱えると
+        # rerun毎のセッションシリアライズが重くなる）
+        raw_text = invoice.raw_text or ""
+        if len(raw_text) > _TEXT_PREVIEW_CHARS:
+            raw_text = raw_text[:_TEXT_PREVIEW_CHARS] + "\n…（以下省略）"
+        file_info["text"] = raw_text
+        # OCRが終わればPDFのバイト列は不要。セッションに残すと
+        # ファイル数×サイズ分のメモリをrerunのたびに引きずる。
+        file_info["bytes"] = None
+
+        invoices.append(invoice)
+
+        # デバッグ情報：抽出結果を表示
+        month_info = f"（{file_info.get('selected_month')}月分）" if mode == "single" else ""
+        fields_info = f" - フィールド: {invoice.fields}" if invoice.fields else " - フィールド: なし"
+        st.success(f"✅ {file_info['name']} {month_info}の処理が完了しました{fields_info}")
+
+    # まとめて1回だけ書き戻す
+    st.session_state.pdf_files = pdf_files
 
     excel_path = excel_service.write_invoices(
         invoices,
@@ -314,14 +364,28 @@ def _run_ocr_and_fill_excel(
 # ------------------------------------------------------------
 # 結果表示
 # ------------------------------------------------------------
+@st.cache_data(show_spinner=False)
+def _load_excel_bytes(path: str, mtime: float) -> bytes:
+    """生成済みExcelのバイト列を読み込む。
+
+    Streamlitはウィジェット操作のたびにrerunするため、素朴に
+    open().read() するとクリックもしていないのに毎回ファイルを
+    読み直すことになる。mtimeをキャッシュキーに含めることで、
+    Excelが再生成されたときだけ読み直し、rerunや再クリックは
+    プロセス内キャッシュから配信する。
+    """
+    return Path(path).read_bytes()
+
+
 def _render_results_area() -> None:
     output_path = st.session_state.get("output_file") or ""
 
-    if output_path and Path(output_path).exists():
-        with open(output_path, "rb") as f:
+    if output_path:
+        path = Path(output_path)
+        if path.exists():
             st.download_button(
                 label="テンプレExcel（上書き済み）をダウンロード",
-                data=f.read(),
+                data=_load_excel_bytes(output_path, path.stat().st_mtime),
                 file_name=_build_excel_filename(),
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             )
@@ -330,11 +394,15 @@ def _render_results_area() -> None:
         for file_info in st.session_state.pdf_files:
             st.write(f"**{file_info['name']}** - {file_info['status']}")
             if file_info["status"] == "完了":
-                st.text_area(
-                    "OCRテキスト",
-                    file_info["text"],
-                    height=150,
-                    key=f"text_{file_info['name']}",
-                )
+                # 折りたたんでおき、複数ファイル分のテキストを
+                # rerunのたびに全部描画しないようにする
+                with st.expander("OCRテキスト", expanded=False):
+                    st.text_area(
+                        "OCRテキスト",
+                        file_info["text"],
+                        height=150,
+                        key=f"text_{file_info['name']}",
+                        label_visibility="collapsed",
+                    )
             elif file_info["status"] == "エラー":
                 st.write("エラーが発生しました。")
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-from typing import List, Optional
+import threading
+from functools import lru_cache
+from typing import List, Optional, TypedDict
 from pathlib import Path
 import uuid
 
 import re
 
+import orjson
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from pydantic import BaseModel
 
 from ...domain.invoice import Invoice
@@ -24,21 +27,270 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # job_id -> Excel file path
+# 上限を超えたら古いジョブから追い出す（dictは挿入順を保持する）。
+# 放置すると辞書も出力xlsxもプロセスの寿命いっぱい溜まり続ける
 _excel_jobs: dict[str, str] = {}
+_EXCEL_JOBS_MAX_ENTRIES = 64
+_EXCEL_JOBS_LOCK = threading.Lock()
+
+# job_id -> 最後にExcelへ反映した上書き内容 (address, corp_number, kwh_overrides)。
+# 同じ内容での再ダウンロード時にワークブックの再パース・再保存をスキップする
+_applied_overrides: dict[str, tuple] = {}
+
+
+def _register_excel_job(excel_path: str) -> str:
+    """生成済みExcelを新しい job_id に紐付けて登録する。
+
+    上限超過時は古いジョブを追い出し、対応するxlsxもディスクから
+    削除する（ファイル削除はロックの外で行う）。
+    """
+    job_id = uuid.uuid4().hex
+    evicted: list[str] = []
+    with _EXCEL_JOBS_LOCK:
+        while len(_excel_jobs) >= _EXCEL_JOBS_MAX_ENTRIES:
+            old_id = next(iter(_excel_jobs))
+            evicted.append(_excel_jobs.pop(old_id))
+            _applied_overrides.pop(old_id, None)
+        _excel_jobs[job_id] = excel_path
+    for old_path in evicted:
+        try:
+            Path(old_path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"期限切れExcelの削除に失敗: {old_path}: {e}")
+    return job_id
+
+# /process で同時に処理するファイル数の上限（メモリとAzureレート対策）
+_MAX_CONCURRENT_FILES = 4
+
+# これ未満の文字数しかないOCR結果は品質判定するまでもなく
+# テキスト層フォールバックを試す
+_MIN_OCR_TEXT_CHARS = 200
+
+
+@lru_cache(maxsize=1)
+def _get_services() -> "tuple[dict, OcrService, ExcelService]":
+    """設定とサービスをプロセス内で1回だけ構築して使い回す。
+
+    どのサービスも状態を持たず設定しか抱えていないため、
+    リクエスト毎に load_app_config() とコンストラクタを
+    回し直すのは純粋な無駄でしかない。
+    """
+    cfg = load_app_config()
+    return cfg, OcrService(cfg), ExcelService(cfg)
+
+
+# 日本語率の判定用。ファイル毎に呼ばれるため、リクエストのたびに
+# 構築し直さずモジュール読み込み時に1回だけ用意する
+_WS_RE = re.compile(r"\s+")
+# 日本語コードポイント（ひらがな・カタカナ・CJK統合漢字）を削除する
+# translate 用テーブル。削除前後の長さ差がそのまま日本語文字数になる
+_JP_DEL_TBL = {cp: None for cp in range(0x3040, 0x3100)}
+_JP_DEL_TBL.update((cp, None) for cp in range(0x4E00, 0xA000))
 
 
 def _japanese_ratio(text: str) -> float:
     if not text:
         return 0.0
-    japanese_chars = re.findall(r"[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]", text)
-    total_chars = len(re.sub(r"\s+", "", text))
-    return (len(japanese_chars) / total_chars) if total_chars else 0.0
+    # findall で1文字ずつのリストを組み立てると長いOCRテキストで
+    # アロケーションが支配的になる。translate（C実装の1パス）で
+    # 日本語文字を落とし、長さの差分から数だけ取り出す
+    without_ws = _WS_RE.sub("", text)
+    total_chars = len(without_ws)
+    if not total_chars:
+        return 0.0
+    jp_chars = total_chars - len(without_ws.translate(_JP_DEL_TBL))
+    return jp_chars / total_chars
+
+# /process が返す1ファイル分の結果
+# （実行時はただのdictのままorjsonで直列化する。pydanticモデル化すると
+#   レスポンス生成のたびにバリデーションを通る分むしろ遅くなる）
+class ProcessResult(TypedDict, total=False):
+    filename: str
+    status: str
+    fields: dict
+    kwh: str              # 単月モードのみ
+    ocr_text: str
+    ocr_confidence: float
+    text_source: str
+    error: str            # エラー時のみ
+
 
 # リクエストボディのモデル定義
 class ExcelGenerationRequest(BaseModel):
     corp_name: str
     invoices_data: List[dict]  # OCR結果のリスト
 
+async def _process_one_pdf(
+    ocr_service: OcrService,
+    file: UploadFile,
+    mode: str,
+    month_map: dict,
+    start_month: Optional[int],
+    month_order: Optional[str],
+    semaphore: asyncio.Semaphore,
+) -> tuple[ProcessResult, Optional[Invoice]]:
+    """1ファイル分のOCR〜kWh抽出。/process から並列に実行される。
+
+    ファイル内容はこの中で初めて読み込む。タスク自体が
+    asyncio.gather で並走するため、スプールからの read も
+    ファイル間で重なり合う（直列にはならない）。Starlette側で
+    大きいアップロードはディスクにスプールされているため、
+    セマフォで同時実行数を絞れば「同時に処理中のファイル分」
+    しかバイト列がメモリに乗らない。
+
+    Returns:
+        (レスポンス用の結果dict, Invoice)。エラー時はInvoiceがNone。
+    """
+    filename = file.filename
+    try:
+        async with semaphore:
+            content = await file.read()
+            logger.info(f"処理開始: {filename}, mode={mode}")
+
+            if mode == "single":
+                # 単月モード
+                selected_month = month_map.get(filename, 1)
+
+                # 月が特定できないままOCRしても結果は捨てるしかないので、
+                # Azure呼び出し（数秒＋課金）ごと省く
+                if not selected_month:
+                    logger.warning(f"{filename}: 対象月が未指定のためOCRをスキップ")
+                    return ({
+                        "filename": filename,
+                        "status": "月未指定",
+                        "fields": {},
+                        "kwh": "",
+                        "ocr_text": "",
+                        "ocr_confidence": 0
+                        ,"text_source": "none"
+                    }, None)
+
+                # 1) まずOCR
+                # （Azureポーリングでスレッドを塞がないようワーカースレッドで実行）
+                invoice = await asyncio.to_thread(
+                    ocr_service.analyze_invoice,
+                    content,
+                    mode="single",
+                    start_month=None,
+                )
+
+                ocr_confidence = invoice.fields.get("ocr_confidence", 0) if invoice.fields else 0
+                text_source = "ocr"
+                ocr_text = invoice.raw_text or ""
+                best_text = ocr_text
+
+                # OCRで既にkWhが取れているなら保持する（本文だけ差し替えるケースのため）
+                kwh_from_ocr = ""
+                if invoice.fields and selected_month:
+                    kwh_from_ocr = invoice.fields.get(f"{selected_month}月値", "") or ""
+                if not kwh_from_ocr and selected_month and ocr_text:
+                    kwh_from_ocr = OcrService._extract_kwh_from_text(ocr_text)
+
+                # 2) OCR品質が低い場合のみテキスト層へフォールバック
+                # （信頼度だけで判定が付くなら日本語率の全文スキャンは走らせない）
+                if best_text:
+                    # 極端に短い結果は判定するまでもなくフォールバック対象。
+                    # 長さ→信頼度→日本語率の順に安い条件から当てる
+                    should_fallback = (
+                        len(best_text) < _MIN_OCR_TEXT_CHARS
+                        or ocr_confidence < 0.8
+                        or _japanese_ratio(best_text) < 0.2
+                    )
+                else:
+                    should_fallback = True
+
+                # kWhが既に取れているなら、フォールバックの成果は表示テキストの
+                # 差し替えだけ。その程度のためにPyMuPDFの全ページパースを払わない
+                # （信頼度が低くてもkWhの正規表現が当たる請求書は珍しくない）
+                if should_fallback and not kwh_from_ocr:
+                    extracted = extract_text_from_pdf_bytes(content)
+                    if extracted:
+                        best_text = extracted
+                        text_source = "pdf_text"
+
+                # kWhは「OCRで取れていればそれを優先」。無い場合のみ、表示テキスト(best_text)から再抽出。
+                # best_text が ocr_text のままなら抽出済み（上で空だった）なので
+                # 同じテキストに抽出パイプラインを二度かけない
+                kwh_value = kwh_from_ocr
+                if not kwh_value and selected_month and best_text and best_text is not ocr_text:
+                    kwh_value = OcrService._extract_kwh_from_text(best_text)
+
+                if selected_month and kwh_value:
+                    invoice.fields = {f"{selected_month}月値": kwh_value, "ocr_confidence": ocr_confidence}
+                    logger.info(f"{filename}: {selected_month}月値={kwh_value}, 信頼度={ocr_confidence:.2f}")
+                else:
+                    invoice.fields = {"ocr_confidence": ocr_confidence}
+                    logger.warning(f"{filename}: kWh値を抽出できませんでした")
+
+                # 返却用テキストに合わせて raw_text も更新しておく（表示用途）
+                invoice.raw_text = best_text
+
+                return ({
+                    "filename": filename,
+                    "status": "完了" if kwh_value else "kWh未検出",
+                    "fields": invoice.fields,
+                    "kwh": kwh_value,
+                    "ocr_text": best_text,
+                    "ocr_confidence": ocr_confidence
+                    ,"text_source": text_source
+                }, invoice)
+
+            else:
+                # 複数月モード
+
+                # 1) まずOCR
+                invoice = await asyncio.to_thread(
+                    ocr_service.analyze_invoice,
+                    content,
+                    mode="multi",
+                    start_month=start_month,
+                    month_order=month_order,
+                )
+
+                ocr_confidence = invoice.fields.get("ocr_confidence", 0) if invoice.fields else 0
+                text_source = "ocr"
+                best_text = invoice.raw_text or ""
+
+                # 2) OCR品質が低い場合のみテキスト層へフォールバック（表示用テキストの置き換え）
+                # （信頼度だけで判定が付くなら日本語率の全文スキャンは走らせない）
+                if best_text:
+                    # 極端に短い結果は判定するまでもなくフォールバック対象。
+                    # 長さ→信頼度→日本語率の順に安い条件から当てる
+                    should_fallback = (
+                        len(best_text) < _MIN_OCR_TEXT_CHARS
+                        or ocr_confidence < 0.8
+                        or _japanese_ratio(best_text) < 0.2
+                    )
+                else:
+                    should_fallback = True
+
+                if should_fallback:
+                    extracted = extract_text_from_pdf_bytes(content)
+                    if extracted:
+                        best_text = extracted
+                        text_source = "pdf_text"
+
+                # kWh値が1つでも抽出できているか確認
+                kwh_extracted = invoice.has_month_value
+
+                return ({
+                    "filename": filename,
+                    "status": "完了" if kwh_extracted else "kWh未検出",
+                    "fields": invoice.fields,
+                    "ocr_text": best_text,
+                    "ocr_confidence": ocr_confidence
+                    ,"text_source": text_source
+                }, invoice)
+
+    except Exception as e:
+        logger.error(f"{filename}の処理中にエラー: {str(e)}", exc_info=True)
+        return ({
+            "filename": filename,
+            "status": "エラー",
+            "error": str(e)
+        }, None)
+
+
 @router.post("/process")
 async def process_pdfs(
     corp_name: str = Form(""),
@@ -65,156 +317,62 @@ async def process_pdfs(
         処理結果のJSON
     """
     try:
-        # 設定読み込み
-        cfg = load_app_config()
-        ocr_service = OcrService(cfg)
-        excel_service = ExcelService(cfg)
+        # 設定・サービス（プロセス内シングルトン）
+        _, ocr_service, excel_service = _get_services()
         
         # 月マッピング情報をパース
         try:
-            mappings = json.loads(month_mappings)
+            mappings = orjson.loads(month_mappings)
             month_map = {m['filename']: m['selectedMonth'] for m in mappings}
         except Exception as e:
             logger.error(f"月マッピングのパースに失敗: {e}")
             month_map = {}
         
         invoices: List[Invoice] = []
-        results = []
-        
-        for file in files:
-            try:
-                # ファイル内容を読み込み
-                content = await file.read()
-                
-                logger.info(f"処理開始: {file.filename}, mode={mode}")
-                
-                if mode == "single":
-                    # 単月モード
-                    selected_month = month_map.get(file.filename, 1)
-
-                    # 1) まずOCR
-                    invoice = ocr_service.analyze_invoice(
-                        content,
-                        mode="single",
-                        start_month=None
-                    )
+        results: List[ProcessResult] = []
+
+        # ファイル毎のOCRを並列実行する。
+        # Azureのポーリング待ちが処理時間の大半を占めるため、同時に投げることで
+        # 合計時間はほぼ「最も遅い1件分」まで縮む。
+        # セマフォで同時実行数を絞り、大量アップロード時にバイト列が
+        # 一度に全件分メモリへ乗らないようにする。
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_FILES)
+        outcomes = await asyncio.gather(*[
+            _process_one_pdf(
+                ocr_service,
+                file,
+                mode,
+                month_map,
+                start_month,
+                month_order,
+                semaphore,
+            )
+            for file in files
+        ])
 
-                    ocr_confidence = invoice.fields.get("ocr_confidence", 0) if invoice.fields else 0
-                    text_source = "ocr"
-                    ocr_text = invoice.raw_text or ""
-                    best_text = ocr_text
-
-                    # OCRで既にkWhが取れているなら保持する（本文だけ差し替えるケースのため）
-                    kwh_from_ocr = ""
-                    if invoice.fields and selected_month:
-                        kwh_from_ocr = invoice.fields.get(f"{selected_month}月値", "") or ""
-                    if not kwh_from_ocr and selected_month and ocr_text:
-                        kwh_from_ocr = OcrService._extract_kwh_from_text(ocr_text)
-
-                    # 2) OCR品質が低い場合のみテキスト層へフォールバック
-                    if best_text:
-                        jr = _japanese_ratio(best_text)
-                        should_fallback = (ocr_confidence < 0.8) or (jr < 0.2)
-                    else:
-                        should_fallback = True
-
-                    if should_fallback:
-                        extracted = extract_text_from_pdf_bytes(content)
-                        if extracted:
-                            best_text = extracted
-                            text_source = "pdf_text"
-
-                    # kWhは「OCRで取れていればそれを優先」。無い場合のみ、表示テキスト(best_text)から再抽出。
-                    kwh_value = kwh_from_ocr
-                    if not kwh_value and selected_month and best_text:
-                        kwh_value = OcrService._extract_kwh_from_text(best_text)
-
-                    if selected_month and kwh_value:
-                        invoice.fields = {f"{selected_month}月値": kwh_value, "ocr_confidence": ocr_confidence}
-                        logger.info(f"{file.filename}: {selected_month}月値={kwh_value}, 信頼度={ocr_confidence:.2f}")
-                    else:
-                        invoice.fields = {"ocr_confidence": ocr_confidence}
-                        logger.warning(f"{file.filename}: kWh値を抽出できませんでした")
-
-                    # 返却用テキストに合わせて raw_text も更新しておく（表示用途）
-                    invoice.raw_text = best_text
-                    
-                    invoices.append(invoice)
-                    results.append({
-                        "filename": file.filename,
-                        "status": "完了" if kwh_value else "kWh未検出",
-                        "fields": invoice.fields,
-                        "kwh": kwh_value,
-                        "ocr_text": best_text,
-                        "ocr_confidence": ocr_confidence
-                        ,"text_source": text_source
-                    })
-                    
-                else:
-                    # 複数月モード
-
-                    # 1) まずOCR
-                    invoice = ocr_service.analyze_invoice(
-                        content,
-                        mode="multi",
-                        start_month=start_month,
-                        month_order=month_order
-                    )
+        # アップロード順のまま結果を組み立てる（gatherは投入順を保持する）
+        for result, invoice in outcomes:
+            results.append(result)
+            if invoice is not None:
+                invoices.append(invoice)
 
-                    ocr_confidence = invoice.fields.get("ocr_confidence", 0) if invoice.fields else 0
-                    text_source = "ocr"
-                    best_text = invoice.raw_text or ""
-
-                    # 2) OCR品質が低い場合のみテキスト層へフォールバック（表示用テキストの置き換え）
-                    if best_text:
-                        jr = _japanese_ratio(best_text)
-                        should_fallback = (ocr_confidence < 0.8) or (jr < 0.2)
-                    else:
-                        should_fallback = True
-
-                    if should_fallback:
-                        extracted = extract_text_from_pdf_bytes(content)
-                        if extracted:
-                            best_text = extracted
-                            text_source = "pdf_text"
-                    
-                    # kWh値が1つでも抽出できているか確認
-                    kwh_extracted = any(key.endswith('月値') for key in invoice.fields.keys()) if invoice.fields else False
-                    
-                    invoices.append(invoice)
-                    results.append({
-                        "filename": file.filename,
-                        "status": "完了" if kwh_extracted else "kWh未検出",
-                        "fields": invoice.fields,
-                        "ocr_text": best_text,
-                        "ocr_confidence": ocr_confidence
-                        ,"text_source": text_source
-                    })
-                
-            except Exception as e:
-                logger.error(f"{file.filename}の処理中にエラー: {str(e)}", exc_info=True)
-                results.append({
-                    "filename": file.filename,
-                    "status": "エラー",
-                    "error": str(e)
-                })
-        
         # Excelに書き込み
+        # （openpyxlの読み書きはブロッキングなのでイベントループから逃がす）
         try:
-            excel_path = excel_service.write_invoices(
+            excel_path = await asyncio.to_thread(
+                excel_service.write_invoices,
                 invoices, 
                 corp_name=corp_name,
                 address=address,
                 corp_number=corp_number
             )
-            job_id = uuid.uuid4().hex
-            _excel_jobs[job_id] = excel_path
+            job_id = _register_excel_job(excel_path)
             logger.info(f"Excel書き込み完了: {excel_path}")
         except Exception as e:
             logger.error(f"Excel書き込みエラー: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Excel書き込みエラー: {str(e)}")
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "results": results,
             "excel_path": excel_path,
@@ -242,12 +400,29 @@ async def download_excel(
     if not excel_path or not Path(excel_path).exists():
         raise HTTPException(status_code=404, detail="Excelファイルが見つかりません（job_idが無効か期限切れです）")
     
-    # 住所/法人番号/kWh上書きが指定されている場合、Excelファイルを更新
-    if address or corp_number or kwh_overrides:
+    # 上書きが無ければワークブックに触らず即返す。
+    # FileResponse は sendfile ベースでストリーム配信するので、
+    # ファイル全体をPythonのメモリへ読み込むことはない
+    if not (address or corp_number or kwh_overrides):
+        return FileResponse(
+            excel_path,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            filename=Path(excel_path).name
+        )
+
+    # 住所/法人番号/kWh上書きが指定されている場合、Excelファイルを更新。
+    # ただし前回のダウンロードと同じ内容なら、ファイルには既に反映済み
+    # なので再パース・再保存（ZIP+XMLの往復）を丸ごと省く
+    overrides_sig = (address, corp_number, kwh_overrides)
+    if _applied_overrides.get(job_id) != overrides_sig:
         try:
             from openpyxl import load_workbook
-            cfg = load_app_config()
-            wb = load_workbook(excel_path)
+            cfg, _, _ = _get_services()
+            # 数セル書き換えるだけなので、外部リンク等のパースは省く。
+            # ZIP展開＋XMLパースはブロッキングなのでワーカースレッドで行う
+            wb = await asyncio.to_thread(
+                load_workbook, excel_path, keep_links=False, rich_text=False
+            )
             sheet_name = cfg.get("excel_cell_map", {}).get("sheet", wb.sheetnames[0])
             ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.active
             
@@ -262,26 +437,11 @@ async def download_excel(
             # kWhの上書き（{"1": "12345", "2": "23456" ...} のようなJSON文字列）
             if kwh_overrides:
                 try:
-                    overrides_raw = json.loads(kwh_overrides)
+                    overrides_raw = orjson.loads(kwh_overrides)
                 except Exception as e:
                     logger.warning(f"kWh上書きのパースに失敗: {e}")
                     overrides_raw = {}
 
-                month_cells = {
-                    1: "B21",
-                    2: "C21",
-                    3: "D21",
-                    4: "E21",
-                    5: "F21",
-                    6: "G21",
-                    7: "H21",
-                    8: "I21",
-                    9: "J21",
-                    10: "K21",
-                    11: "L21",
-                    12: "M21",
-                }
-
                 for k, v in (overrides_raw or {}).items():
                     try:
                         key_str = str(k).strip()
@@ -296,17 +456,17 @@ async def download_excel(
                     if value_str == "":
                         continue
 
-                    cell = month_cells.get(month)
-                    if not cell:
-                        continue
-
-                    # 数値として書き込み（無理なら文字列）
+                    # 数値として書き込み（無理なら文字列）。
+                    # ws["B21"] 形式だとopenpyxlが座標文字列のパースを挟むので、
+                    # 行21固定・列=月+1（1月=B列）を数値指定で直接書く
                     try:
-                        ws[cell] = int(value_str.replace(",", ""))
+                        value = int(value_str.replace(",", ""))
                     except Exception:
-                        ws[cell] = value_str
+                        value = value_str
+                    ws.cell(row=21, column=month + 1).value = value
             
-            wb.save(excel_path)
+            await asyncio.to_thread(wb.save, excel_path)
+            _applied_overrides[job_id] = overrides_sig
             logger.info(f"Excelファイル更新: 住所={address}, 法人番号={corp_number}, kWh上書き={'あり' if kwh_overrides else 'なし'}")
         except Exception as e:
             logger.warning(f"Excelファイルの更新に失敗: {e}")
@@ -329,9 +489,8 @@ async def process_single_pdf(
     単一のPDFファイルをOCR処理して結果を返す
     """
     try:
-        # 設定読み込み
-        cfg = load_app_config()
-        ocr_service = OcrService(cfg)
+        # 設定・サービス（プロセス内シングルトン）
+        _, ocr_service, _ = _get_services()
         
         content = await file.read()
         logger.info(f"単一処理開始: {file.filename}, mode={mode}, month={selected_month}")
@@ -341,10 +500,11 @@ async def process_single_pdf(
         
         if mode == "single":
             # 単月モード
-            invoice = ocr_service.analyze_invoice(
+            invoice = await asyncio.to_thread(
+                ocr_service.analyze_invoice,
                 content,
                 mode="single",
-                start_month=None
+                start_month=None,
             )
             
             # OCRテキストから直接kWh値を抽出
@@ -356,14 +516,15 @@ async def process_single_pdf(
                     invoice.fields = {}
         else:
             # 複数月モード
-            invoice = ocr_service.analyze_invoice(
+            invoice = await asyncio.to_thread(
+                ocr_service.analyze_invoice,
                 content,
                 mode="multi",
-                start_month=start_month
+                start_month=start_month,
             )
             # 複数月モードの場合はfieldsに既にデータが入っているはず
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "filename": file.filename,
             "fields": invoice.fields,
@@ -372,7 +533,7 @@ async def process_single_pdf(
 
     except Exception as e:
         logger.error(f"単一処理エラー: {str(e)}", exc_info=True)
-        return JSONResponse({
+        return ORJSONResponse({
             "success": False,
             "filename": file.filename,
             "error": str(e)
@@ -384,11 +545,8 @@ async def generate_excel(request: ExcelGenerationRequest):
     """
     OCR結果のリストを受け取りExcelを生成する
     """
-    global _last_excel_path
-    
     try:
-        cfg = load_app_config()
-        excel_service = ExcelService(cfg)
+        _, _, excel_service = _get_services()
         
         invoices = []
         for data in request.invoices_data:
@@ -397,12 +555,18 @@ async def generate_excel(request: ExcelGenerationRequest):
             inv.fields = data.get("fields", {})
             invoices.append(inv)
             
-        excel_path = excel_service.write_invoices(invoices, corp_name=request.corp_name)
-        _last_excel_path = excel_path
-        
-        return JSONResponse({
+        excel_path = await asyncio.to_thread(
+            excel_service.write_invoices, invoices, corp_name=request.corp_name
+        )
+
+        # /process と同じ job_id 方式で登録する（単一グローバルだと
+        # 同時利用ユーザー同士でパスを上書きし合ってしまう）
+        job_id = _register_excel_job(excel_path)
+
+        return ORJSONResponse({
             "success": True,
-            "excel_path": excel_path
+            "excel_path": excel_path,
+            "job_id": job_id
         })
         
     except Exception as e: